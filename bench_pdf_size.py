@@ -0,0 +1,126 @@
+"""
+bench_pdf_size.py – size / time benchmark for compact PTT output
+================================================================
+
+Compares a sample batch of one-PDF-per-row output:
+
+1. as produced (Word defaults)
+2. ``compact_pdf`` on every file
+3. ``merge_pdfs`` – one batch file sharing the logo and other identical
+   resources
+
+With ``--rows`` the sample is generated first, once normally and once
+with ``compact=True`` (on-screen Word export + ``compact_pdf``), and both
+runs are reported before the post-processing comparison.
+
+Usage
+-----
+    python bench_pdf_size.py GeneratedDocuments            # existing PDFs
+    python bench_pdf_size.py --rows sample.txt --op Bench   # generate first
+
+The input folder is never modified – everything runs on a temp copy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from fill_ptt import compact_pdf, merge_pdfs
+
+
+def _size(paths: List[Path]) -> int:
+    return sum(p.stat().st_size for p in paths)
+
+
+def _fmt(n: int) -> str:
+    return f"{n / 1024:,.1f} KiB"
+
+
+def _generate_sample(rows_file: str, op_name: str, outdir: Path,
+                     compact: bool = False) -> float:
+    from parse_rows import parse_ptt_rows_from_text
+    from fill_ptt import generate_ptt_for_records, make_converter
+
+    records = parse_ptt_rows_from_text(Path(rows_file).read_text("utf-8-sig"))
+    converter = make_converter()                 # warm Word, like the GUI
+    try:
+        t0 = time.perf_counter()
+        generate_ptt_for_records(records, op_name, converter=converter,
+                                 outdir=str(outdir), compact=compact)
+        return time.perf_counter() - t0
+    finally:
+        if converter is not None:
+            converter.close()
+
+
+def run(folder: Path) -> None:
+    pdfs = sorted(folder.glob("*.pdf"))
+    if not pdfs:
+        sys.exit(f"no PDFs in {folder}")
+
+    with tempfile.TemporaryDirectory(prefix="ptt_bench_") as tmp:
+        work = Path(tmp)
+        copies = []
+        for p in pdfs:
+            shutil.copy2(p, work / p.name)
+            copies.append(work / p.name)
+        base = _size(copies)
+
+        merged = work / "PTT_BATCH.pdf"
+        t0 = time.perf_counter()
+        merge_pdfs([str(p) for p in copies], str(merged))
+        t_merge = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for p in copies:
+            compact_pdf(str(p))
+        t_compact = time.perf_counter() - t0
+        compacted = _size(copies)
+
+        merged_size = merged.stat().st_size
+        print(f"{len(pdfs)} PDF(s) from {folder}")
+        print(f"  original          {_fmt(base):>14}")
+        print(f"  compact_pdf each  {_fmt(compacted):>14}  "
+              f"({compacted / base:6.1%})  {t_compact:6.2f}s")
+        print(f"  merged batch      {_fmt(merged_size):>14}  "
+              f"({merged_size / base:6.1%})  {t_merge:6.2f}s")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark compact PTT PDF output")
+    ap.add_argument("folder", nargs="?", help="folder with sample PTT PDFs")
+    ap.add_argument("--rows", help="pasted-rows text file to generate a sample batch")
+    ap.add_argument("--op", default="Bench", help="operator name for --rows")
+    args = ap.parse_args(argv)
+
+    if args.rows:
+        with tempfile.TemporaryDirectory(prefix="ptt_sample_") as tmp:
+            plain, small = Path(tmp, "plain"), Path(tmp, "compact")
+            plain.mkdir()
+            small.mkdir()
+            t_plain = _generate_sample(args.rows, args.op, plain)
+            t_small = _generate_sample(args.rows, args.op, small, compact=True)
+            base = _size(list(plain.glob("*.pdf")))
+            size = _size(list(small.glob("*.pdf")))
+            if not base:
+                sys.exit("sample generation produced no PDFs")
+            print("generated sample batch")
+            print(f"  plain             {_fmt(base):>14}           {t_plain:6.2f}s")
+            print(f"  compact=True      {_fmt(size):>14}  "
+                  f"({size / base:6.1%})  {t_small:6.2f}s")
+            run(plain)
+    elif args.folder:
+        run(Path(args.folder))
+    else:
+        ap.error("give a folder of PDFs or --rows")
+    return 0
+
+
+if __name__ == "__main__":                         # pragma: no cover
+    sys.exit(main())
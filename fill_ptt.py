@@ -5,7 +5,17 @@ fill_ptt.py – backend helpers for GA Office Helper
 • Locates the PTT Word template inside the bundled `_internal/` folder
   (works both from source and from a PyInstaller build).
 • Defines GA3 firm metadata and exposes
-  `generate_ptt_for_records()` which turns parsed rows into PDF files.
+  `generate_ptt_for_records()` which turns parsed rows into PDF files,
+  and `generate_flight_summaries()` which renders one consolidated PTT
+  per flight group (see `parse_rows.group_records_by_flight`).
+• The template is read from disk once and rendered from memory; callers
+  that convert many documents (e.g. `ptt_service`) can pass a warm
+  `WordConverter` instead of letting docx2pdf start Word per file.
+• ``compact=True`` has Word export subset fonts / screen-sized images (with
+  a `WordConverter`) and then shrinks every PDF (`compact_pdf`);
+  `merge_batch` builds one batch file whose pages share the logo and
+  other identical resources.  Both need pypdf; a PDF that cannot be
+  compacted is kept as converted.
 """
 
 from __future__ import annotations
@@ -13,11 +23,14 @@ from __future__ import annotations
 import os
 import sys
 import subprocess
+import threading
 from datetime import date
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Optional
 
-from docxtpl import DocxTemplate
+from docxtpl import DocxTemplate, Listing
 from docx2pdf import convert
 from airline_map import AIRLINE_MAP          # local module
 
@@ -37,6 +50,87 @@ else:  # macOS / Linux – docx2pdf won’t run anyway, but keep no-op stubs
     def _com_end() -> None:   ...
 # ─────────────────────────────────────────────────────────────────────
 
+Converter = Callable[[str, str], None]       # (docx_path, pdf_path) → None
+
+
+class WordConverter:
+    """
+    Keeps one private Word instance open for many conversions.
+
+    Word is apartment-threaded: create, use and `close()` a converter on the
+    same thread (the service gives every pool thread its own).  If Word
+    crashes or is killed, the next conversion starts a fresh instance and
+    retries once.
+    """
+
+    def __init__(self) -> None:
+        import pywintypes                        # Windows only
+        import win32com.client
+
+        self._dispatch = lambda: win32com.client.DispatchEx("Word.Application")
+        self._com_error = pywintypes.com_error
+        _com_begin()
+        self._start()
+
+    def _start(self) -> None:
+        self._word = self._dispatch()
+        self._word.Visible = False
+        self._word.DisplayAlerts = 0
+
+    def _restart(self) -> None:
+        print("[WARN] Word stopped responding – starting a new instance")
+        try:
+            self._word.Quit()
+        except Exception:                        # noqa: BLE001 – likely dead
+            pass
+        self._start()
+
+    def __call__(self, docx_path: str, pdf_path: str, compact: bool = False) -> None:
+        try:
+            self._export(docx_path, pdf_path, compact)
+        except self._com_error:                  # RPC server gone, Word killed …
+            self._restart()
+            self._export(docx_path, pdf_path, compact)
+
+    def _export(self, docx_path: str, pdf_path: str, compact: bool) -> None:
+        doc = self._word.Documents.Open(str(Path(docx_path).resolve()),
+                                        ReadOnly=True, AddToRecentFiles=False)
+        try:
+            if compact:                          # subset fonts, screen-sized images
+                doc.ExportAsFixedFormat(
+                    str(Path(pdf_path).resolve()), ExportFormat=17,   # wdExportFormatPDF
+                    OptimizeFor=1,                                    # …OptimizeForOnScreen
+                    IncludeDocProps=False, DocStructureTags=False,
+                    BitmapMissingFonts=True, UseISO19005_1=False,
+                )
+            else:
+                doc.SaveAs(str(Path(pdf_path).resolve()), FileFormat=17)   # wdFormatPDF
+        finally:
+            doc.Close(0)
+
+    def close(self) -> None:
+        try:
+            self._word.Quit()
+        except self._com_error:                  # already gone
+            pass
+        finally:
+            _com_end()
+
+
+def make_converter() -> Optional[Converter]:
+    """
+    A warm `WordConverter` on Windows; None elsewhere or if Word will not
+    start, in which case the generators fall back to docx2pdf.  Call it on
+    the thread that will do the converting.
+    """
+    if sys.platform != "win32":
+        return None
+    try:
+        return WordConverter()
+    except Exception as e:                       # noqa: BLE001
+        print(f"[WARN] Word start failed, using docx2pdf: {e}")
+        return None
+
 # ─────────────── firm metadata ───────────────────────────────────────
 FIRM_INFO: dict[str, str] = {
     "FirmCode":     "WBS6",
@@ -55,6 +149,31 @@ def get_template_path() -> str:
         base = Path(__file__).parent
     return str(base / "_internal" / "LAX_PTT_Template.docx")
 
+
+@lru_cache(maxsize=1)
+def load_template_bytes() -> bytes:
+    """The template file, read once per process."""
+    return Path(get_template_path()).read_bytes()
+
+
+# placeholders LAX_PTT_Template.docx must contain
+TEMPLATE_FIELDS = frozenset({
+    "MAWB", "PIECES", "WEIGHT", "FLT", "AirlineName", "TODAYS_DATE", "OPName",
+})
+
+
+def warm_up() -> None:
+    """
+    Load and validate the template and create the output folder ahead of
+    the first job.  Raises if the template is missing or lacks fields.
+    """
+    doc = DocxTemplate(BytesIO(load_template_bytes()))
+    missing = TEMPLATE_FIELDS - doc.get_undeclared_template_variables()
+    if missing:
+        raise ValueError("LAX_PTT_Template.docx is missing placeholders: "
+                         + ", ".join(sorted(missing)))
+    get_output_folder()
+
 # ─────────────── output-folder helpers ───────────────────────────────
 def get_output_folder() -> str:
     base = Path(sys.executable).parent if getattr(sys, "frozen", False) \
@@ -63,6 +182,21 @@ def get_output_folder() -> str:
     out.mkdir(exist_ok=True)
     return str(out)
 
+def claim_unique_path(path: Path) -> Path:
+    """
+    Reserve *path* – or ``<stem>_2``, ``<stem>_3`` … if taken – by creating
+    it exclusively, so concurrent writers never share a file name.
+    """
+    n = 1
+    while True:
+        cand = path if n == 1 else path.with_name(f"{path.stem}_{n}{path.suffix}")
+        try:
+            os.close(os.open(cand, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            n += 1
+            continue
+        return cand
+
 def open_output_folder() -> None:
     folder = get_output_folder()
     if sys.platform == "win32":
@@ -72,54 +206,238 @@ def open_output_folder() -> None:
     else:
         subprocess.run(["xdg-open", folder], check=False)
 
+# ─────────────── render helpers ──────────────────────────────────────
+def _safe_name(text: str) -> str:
+    first = text.splitlines()[0] if text.strip() else ""
+    return "".join(ch for ch in first if ch not in r'\/:*?"<>|')
+
+
+def _render_pdf(context: dict, docx_path: Path,
+                converter: Optional[Converter] = None,
+                compact: bool = False) -> Path:
+    """
+    Render the PTT template with *context*, convert to PDF, drop the .docx.
+    The PDF is named after *docx_path* but never replaces an existing file
+    (``_2``, ``_3`` … – see `claim_unique_path`).
+    """
+    doc = DocxTemplate(BytesIO(load_template_bytes()))
+    doc.render({
+        "FirmCode": FIRM_INFO["FirmCode"], "FirmName": FIRM_INFO["FirmName"],
+        "FullFirmName": FIRM_INFO["FullFirmName"], "Address": FIRM_INFO["Address"],
+        **context,
+    })
+
+    pdf_path = claim_unique_path(docx_path.with_suffix(".pdf"))
+    docx_path = pdf_path.with_suffix(".docx")
+    try:
+        doc.save(docx_path)
+
+        # Word → PDF
+        if compact and isinstance(converter, WordConverter):
+            converter(str(docx_path), str(pdf_path), compact=True)
+        else:
+            (converter or convert)(str(docx_path), str(pdf_path))
+    except BaseException:
+        pdf_path.unlink(missing_ok=True)         # give the name back
+        raise
+    finally:
+        docx_path.unlink(missing_ok=True)        # keep PDFs only
+    if compact:
+        try:
+            compact_pdf(str(pdf_path))
+        except Exception as e:                   # noqa: BLE001 – PDF is still fine
+            print(f"[WARN] could not compact {pdf_path.name}, kept as is: {e}")
+    return pdf_path
+
+
+def _pdf_writer(**kw):
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise RuntimeError("compact / merged PDF output needs pypdf "
+                           "(pip install pypdf)") from None
+    return PdfWriter(**kw)
+
+
+def compact_pdf(pdf_path: str) -> None:
+    """
+    Rewrite *pdf_path* in place with compressed content streams and
+    byte-identical objects collapsed – unless that would not make the
+    file smaller.
+    """
+    writer = _pdf_writer(clone_from=pdf_path)
+    for page in writer.pages:
+        page.compress_content_streams(level=9)
+    writer.compress_identical_objects()   # dedupe + drop orphans
+
+    tmp = Path(pdf_path).with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        writer.write(f)
+    if tmp.stat().st_size < Path(pdf_path).stat().st_size:
+        os.replace(tmp, pdf_path)
+    else:                                        # already tight – keep original
+        tmp.unlink()
+
+
+def merge_pdfs(pdf_paths: List[str], dest: str) -> str:
+    """
+    Append *pdf_paths* into one compact *dest* PDF.  Byte-identical
+    resources such as the logo image are stored once and shared by every
+    page.  Fonts usually are not: Word embeds a separately tagged subset
+    in each PDF, so every page keeps its own.
+    """
+    writer = _pdf_writer()
+    for path in pdf_paths:
+        writer.append(path)
+    for page in writer.pages:
+        page.compress_content_streams(level=9)
+    writer.compress_identical_objects()   # dedupe + drop orphans
+    with open(dest, "wb") as f:
+        writer.write(f)
+    return dest
+
+
+def merge_batch(pdf_paths: List[str], outdir: str, name: str) -> str:
+    """
+    `merge_pdfs` into ``PTT_BATCH_<name>.pdf`` (never overwriting an earlier
+    batch – see `claim_unique_path`), then delete the single-page files.
+    """
+    dest = claim_unique_path(Path(outdir) / f"PTT_BATCH_{_safe_name(name)}.pdf")
+    try:
+        merge_pdfs(pdf_paths, str(dest))
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    for pdf in pdf_paths:
+        Path(pdf).unlink(missing_ok=True)
+    return str(dest)
+
+
+def _format_weight(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
 # ─────────────── main generator ──────────────────────────────────────
 def generate_ptt_for_records(
     records: List[dict],
     op_name: str = "",
+    on_result: Optional[Callable[[dict], None]] = None,
+    converter: Optional[Converter] = None,
+    outdir: Optional[str] = None,
+    compact: bool = False,
+    stop: Optional[threading.Event] = None,
 ) -> List[str]:
     """
     Convert parsed *records* into PDF PTTs and return the PDF paths.
+
+    If *on_result* is given it is called once per record (from this thread)
+    with ``{"index", "record", "status", "error", "pdf"}`` where *status* is
+    ``"ok"`` or ``"failed"`` – the GUI results grid feeds off this.
+
+    *converter* defaults to docx2pdf's ``convert``; *outdir* defaults to
+    `get_output_folder()`; *compact* runs `compact_pdf` on every file.
+    Once *stop* is set the batch ends before the next record.
     """
     today  = date.today().strftime("%m/%d/%Y")
-    outdir = get_output_folder()
+    outdir = outdir or get_output_folder()
     pdfs   = []
 
     _com_begin()                   # ← init COM for **this** thread
 
     try:
-        for rec in records:
-            mawb, flt = rec["mawb"], rec["flt"]
-            pcs,  wt  = rec["pieces"], rec["weight"]
-            airline   = AIRLINE_MAP.get(mawb[:3], "Unknown Airline")
-
-            doc = DocxTemplate(get_template_path())
-            doc.render({
-                "MAWB": mawb, "PIECES": pcs, "WEIGHT": wt, "FLT": flt,
-                "AirlineName": airline, "TODAYS_DATE": today,
-                "FirmCode": FIRM_INFO["FirmCode"], "FirmName": FIRM_INFO["FirmName"],
-                "FullFirmName": FIRM_INFO["FullFirmName"], "Address": FIRM_INFO["Address"],
-                "OPName": op_name,
-            })
-
-            safe_mawb = "".join(ch for ch in mawb.splitlines()[0]
-                                if ch not in r'\/:*?"<>|')
-            docx_path = Path(outdir) / f"PTT_{safe_mawb}.docx"
-            doc.save(docx_path)
-
-            # Word → PDF
+        for idx, rec in enumerate(records):
+            if stop is not None and stop.is_set():
+                break
+            mawb = rec.get("mawb", "")
+            result = {"index": idx, "record": rec, "status": "ok",
+                      "error": "", "pdf": ""}
             try:
-                convert(str(docx_path))
-                pdf_path = docx_path.with_suffix(".pdf")
+                pdf_path = _render_pdf(
+                    {
+                        "MAWB": mawb, "PIECES": rec["pieces"], "WEIGHT": rec["weight"],
+                        "FLT": rec["flt"], "TODAYS_DATE": today, "OPName": op_name,
+                        "AirlineName": AIRLINE_MAP.get(mawb[:3], "Unknown Airline"),
+                    },
+                    Path(outdir) / f"PTT_{_safe_name(mawb)}.docx",
+                    converter, compact,
+                )
                 pdfs.append(str(pdf_path))
-                docx_path.unlink(missing_ok=True)   # keep PDFs only
+                result["pdf"] = str(pdf_path)
             except Exception as e:                  # noqa: BLE001
-                print(f"[WARN] PDF conversion failed for {mawb}: {e}")
+                print(f"[WARN] PTT failed for {mawb}: {e}")
+                result["status"], result["error"] = "failed", str(e)
+
+            if on_result is not None:
+                on_result(result)
 
     finally:
         _com_end()               # tidy up COM even if something exploded
 
     return pdfs
 
+
+def generate_flight_summaries(
+    groups: List[dict],
+    op_name: str = "",
+    on_result: Optional[Callable[[dict], None]] = None,
+    converter: Optional[Converter] = None,
+    outdir: Optional[str] = None,
+    compact: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> List[str]:
+    """
+    Render one consolidated PTT per flight group and return the PDF paths.
+
+    *groups* come from `parse_rows.group_records_by_flight`; the document
+    lists every MAWB of the flight (one per line) with summed pieces and
+    weight.  *on_result* works as in `generate_ptt_for_records`, with
+    ``record`` being a flattened view of the group.  *converter*,
+    *outdir*, *compact* and *stop* as in `generate_ptt_for_records`.
+    """
+    today  = date.today().strftime("%m/%d/%Y")
+    stamp  = date.today().strftime("%Y%m%d")
+    outdir = outdir or get_output_folder()
+    pdfs   = []
+
+    _com_begin()
+
+    try:
+        for idx, grp in enumerate(groups):
+            if stop is not None and stop.is_set():
+                break
+            mawbs  = "\n".join(grp["mawbs"])
+            pieces = str(grp["pieces"])
+            weight = _format_weight(grp["weight"])
+            result = {
+                "index": idx, "status": "ok", "error": "", "pdf": "",
+                "record": {"mawb": mawbs, "flt": grp["flt"], "pieces": pieces,
+                           "weight": weight, "records": grp["records"]},
+            }
+            try:
+                pdf_path = _render_pdf(
+                    {
+                        "MAWB": Listing(mawbs), "PIECES": pieces, "WEIGHT": weight,
+                        "FLT": grp["flt"], "AirlineName": grp["airline"],
+                        "TODAYS_DATE": today, "OPName": op_name,
+                    },
+                    Path(outdir) / (f"PTT_FLT_{_safe_name(grp['prefix'])}_"
+                                    f"{_safe_name(grp['flt'])}_{stamp}.docx"),
+                    converter, compact,
+                )
+                pdfs.append(str(pdf_path))
+                result["pdf"] = str(pdf_path)
+            except Exception as e:                  # noqa: BLE001
+                print(f"[WARN] PTT summary failed for flight {grp['flt']}: {e}")
+                result["status"], result["error"] = "failed", str(e)
+
+            if on_result is not None:
+                on_result(result)
+
+    finally:
+        _com_end()
+
+    return pdfs
+
 # ─────────────── CLI demo (optional) ─────────────────────────────────
 if __name__ == "__main__":                         # pragma: no cover
     from parse_rows import parse_ptt_rows_from_text
@@ -19,7 +19,8 @@ a = Analysis(
     pathex=[str(SRC_DIR)],
     binaries=[],
     datas=[],
-    hiddenimports=collect_submodules("mini_updater"),
+    hiddenimports=collect_submodules("mini_updater")
+                  + collect_submodules("pypdf"),      # compact / merged PDFs
 )
 
 pyz = PYZ(a.pure, a.zipped_data)
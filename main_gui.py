@@ -2,6 +2,7 @@
 # ======================================================
 from __future__ import annotations
 
+import importlib.util
 import json
 import os
 import sys
@@ -13,9 +14,10 @@ from tkinter import messagebox
 import customtkinter as ctk
 from PIL import Image
 
-from parse_rows import parse_ptt_rows_from_text
-from fill_ptt import generate_ptt_for_records, open_output_folder
+from parse_rows import parse_ptt_rows_from_text, group_records_by_flight
 from mini_updater import check_and_update, __version__ as APP_VERSION
+from results_view import ResultsGrid
+from ptt_engine import PTTEngine              # fill_ptt is imported by warm-up
 
 
 # ───────────────────────── helpers ─────────────────────────
@@ -88,8 +90,15 @@ class GAOfficeHelper(ctk.CTk):
         self.tabs.pack(fill="both", expand=True, padx=10, pady=(10, 0))
 
         self._build_ptt_tab()
+        self._build_results_tab()
         self._build_status_bar()
 
+        # warm the generation path once the window is up and idle
+        self.engine = PTTEngine(
+            on_status=lambda msg: self.after(0, self.status_var.set, msg)
+        )
+        self.after(500, lambda: self.after_idle(self.engine.warm_up))
+
     # ───── PTT TAB ─────
     def _build_ptt_tab(self) -> None:
         tab = self.tabs.add("PTT Generator")
@@ -122,11 +131,12 @@ class GAOfficeHelper(ctk.CTk):
         action.pack(fill="x", padx=10, pady=(10, 4))
         ctk.CTkLabel(action, text="").pack(side="left", expand=True)
 
-        ctk.CTkButton(
+        self.generate_btn = ctk.CTkButton(
             action,
             text="Generate PTT Docs",
             command=self._start_ptt_generation,
-        ).pack(side="left", padx=188)
+        )
+        self.generate_btn.pack(side="left", padx=188)
 
         # operator entry
         op_frame = ctk.CTkFrame(action, fg_color="transparent")
@@ -135,12 +145,93 @@ class GAOfficeHelper(ctk.CTk):
         self.opname_var = ctk.StringVar(value=load_settings().get("last_operator", ""))
         ctk.CTkEntry(op_frame, width=140, textvariable=self.opname_var).pack(side="left")
 
-        ctk.CTkButton(tab, text="Open Output Folder", command=open_output_folder).pack(
+        self.consolidate_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            action, text="One PTT per flight", variable=self.consolidate_var
+        ).pack(side="right", padx=10)
+
+        self.compact_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            action, text="Compact PDFs", variable=self.compact_var
+        ).pack(side="right", padx=10)
+
+        self.merge_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            action, text="One batch PDF", variable=self.merge_var
+        ).pack(side="right", padx=10)
+
+        ctk.CTkButton(tab, text="Open Output Folder", command=self._open_output_folder).pack(
             pady=(0, 10)
         )
 
+    def _open_output_folder(self) -> None:
+        from fill_ptt import open_output_folder
+
+        open_output_folder()
+
+    # ───── RESULTS TAB ─────
+    def _build_results_tab(self) -> None:
+        tab = self.tabs.add("Results")
+
+        bar = ctk.CTkFrame(tab, fg_color="transparent")
+        bar.pack(fill="x", padx=10, pady=(10, 4))
+
+        self.results_label = ctk.CTkLabel(bar, text="No batch run yet.", anchor="w")
+        self.results_label.pack(side="left")
+
+        self.rerun_btn = ctk.CTkButton(
+            bar, text="Re-run Failed", width=140, state="disabled",
+            command=self._rerun_failed,
+        )
+        self.rerun_btn.pack(side="right")
+
+        self.failed_only_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            bar, text="Failed only", variable=self.failed_only_var,
+            command=lambda: self.results.set_failed_only(self.failed_only_var.get()),
+        ).pack(side="right", padx=10)
+
+        self.results = ResultsGrid(
+            tab, on_change=self._on_results_change, on_activate=self._open_result_pdf
+        )
+        self.results.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        self._batch_total = 0
+        self._busy = False                 # one batch at a time
+
+    def _on_results_change(self) -> None:
+        ok, failed = self.results.counts()
+        done = ok + failed
+        self.results_label.configure(text=f"{done} / {self._batch_total} processed — "
+                                          f"{ok} OK, {failed} failed")
+        if self._batch_total:
+            self.ptt_bar.set(done / self._batch_total)
+            self.ptt_label.configure(text=f"{done} / {self._batch_total}")
+
+    def _open_result_pdf(self, res: dict) -> None:
+        if res["pdf"] and os.path.exists(res["pdf"]) and sys.platform == "win32":
+            os.startfile(res["pdf"])
+
+    def _rerun_failed(self) -> None:
+        if self._busy:
+            return
+        # consolidated results carry their source rows under "records"
+        records = [r for rec in self.results.failed_records()
+                   for r in rec.get("records", [rec])]
+        if not records:
+            return
+        op_name = self.opname_var.get().strip()
+        if not op_name:
+            messagebox.showwarning(
+                "Operator Required", "Please enter your name before generating."
+            )
+            return
+        self._launch_ptt(records, op_name)
+
     # ---- PTT workflow --------------------------------------------------
     def _start_ptt_generation(self) -> None:
+        if self._busy:
+            return
         raw = self.ptt_text.get("1.0", "end").strip()
         if not raw:
             messagebox.showwarning("No Data", "Please paste some rows first.")
@@ -149,6 +240,8 @@ class GAOfficeHelper(ctk.CTk):
         if not records:
             messagebox.showwarning("No Data", "No valid PTT rows found.")
             return
+        for n, rec in enumerate(records, 1):     # survives re-runs / grouping
+            rec["row"] = n
 
         op_name = self.opname_var.get().strip()
         if not op_name:
@@ -157,33 +250,115 @@ class GAOfficeHelper(ctk.CTk):
             )
             return
 
-        # UI feedback – spinner in the same tab
-        self.status_var.set("Generating PTT documents…")
-        self.ptt_bar.configure(mode="indeterminate")
-        self.ptt_bar.start()
+        self._launch_ptt(records, op_name, from_paste=True)
+
+    def _launch_ptt(self, records, op_name: str, from_paste: bool = False) -> None:
+        if ((self.compact_var.get() or self.merge_var.get())
+                and importlib.util.find_spec("pypdf") is None):
+            messagebox.showwarning(
+                "pypdf Missing",
+                "'Compact PDFs' and 'One batch PDF' need the pypdf package.\n"
+                "Untick them or install pypdf.",
+            )
+            return
+        # UI feedback – determinate bar driven by the results grid
+        self._busy = True
+        self.generate_btn.configure(state="disabled")
+        self.rerun_btn.configure(state="disabled")
+        self.status_var.set("Queued PTT documents…")
+        self.ptt_bar.set(0)
         self.ptt_label.configure(text="Working…")
+        self.results.clear()
+
+        consolidate = self.consolidate_var.get()
+        if consolidate:
+            groups, errors = group_records_by_flight(records)
+            for idx, rec, msg in errors:          # bad pieces / weight
+                self.results.post({"index": idx, "record": rec, "status": "failed",
+                                   "error": msg, "pdf": ""})
+            jobs = groups
+            total = len(groups) + len(errors)
+        else:
+            jobs = records
+            total = len(records)
+        self._batch_total = total
         self.update_idletasks()
 
-        threading.Thread(
-            target=self._worker_ptt_generation,
-            args=(records, op_name),
-            daemon=True,
-        ).start()
+        # runs on the engine thread, after any warm-up still in progress
+        compact, merge = self.compact_var.get(), self.merge_var.get()
+        self.engine.submit(
+            lambda converter: self._worker_ptt_generation(
+                consolidate, jobs, total, op_name, compact, merge, from_paste, converter
+            ),
+            on_error=lambda e: self.after(0, self._batch_failed, e),
+        )
+
+    def _end_batch(self) -> None:
+        self._busy = False
+        self.generate_btn.configure(state="normal")
+        self.ptt_bar.set(0)
+        self.ptt_label.configure(text="")
+
+    def _batch_failed(self, err: Exception) -> None:
+        """A job died outside the per-row handling (merge, Word, disk …)."""
+        self._end_batch()
+        if self.engine.stopping.is_set():          # app is closing – no dialogs
+            return
+        self.status_var.set(f"PTT failed — {err}")
+        self.rerun_btn.configure(state="normal")    # paste box is left as is
+        messagebox.showerror("PTT Error", f"PTT generation stopped:\n{err}")
+
+    def _worker_ptt_generation(self, consolidate: bool, jobs, total: int, op_name: str,
+                               compact: bool, merge: bool, from_paste: bool,
+                               converter) -> None:
+        from fill_ptt import (
+            generate_flight_summaries,
+            generate_ptt_for_records,
+            get_output_folder,
+            merge_batch,
+        )
 
-    def _worker_ptt_generation(self, records, op_name: str) -> None:
-        pdfs = generate_ptt_for_records(records, op_name)
+        self.after(0, self.status_var.set, "Generating PTT documents…")
+        generate = generate_flight_summaries if consolidate else generate_ptt_for_records
+        posted: list[dict] = []
 
-        def _ui_done():
-            self.ptt_bar.stop()
-            self.ptt_bar.configure(mode="determinate")
-            self.ptt_bar.set(0)
-            self.ptt_label.configure(text="")
-            self.ptt_text.delete("1.0", "end")
+        def _on_result(res: dict) -> None:
+            posted.append(res)
+            self.results.post(res)
+
+        pdfs = generate(jobs, op_name, on_result=_on_result,
+                        converter=converter, compact=compact,
+                        stop=self.engine.stopping)
+        failed = total - len(pdfs)
 
-            self.status_var.set(f"PTT done — {len(pdfs)} PDF(s) saved.")
+        if merge and pdfs:                 # archive as one file, shared resources
+            batch = merge_batch(pdfs, get_output_folder(),
+                                date.today().strftime("%Y%m%d"))
+            for res in posted:
+                if res["pdf"]:
+                    res["pdf"] = batch
+
+        def _ui_done():
+            self._end_batch()
+            if self.engine.stopping.is_set():      # app is closing – no dialogs
+                return
+            if from_paste:                 # a re-run must not eat a new paste
+                self.ptt_text.delete("1.0", "end")
+
+            saved = "1 batch PDF" if merge and pdfs else f"{len(pdfs)} PDF(s)"
+            self.status_var.set(f"PTT done — {saved} saved, {failed} failed.")
             save_settings({"last_operator": op_name})
             show_toast(self, f"Generated {len(pdfs)} PTT PDF(s)")
-            messagebox.showinfo("PTT Finished", f"Generated {len(pdfs)} PDF file(s).")
+            if failed:
+                self.rerun_btn.configure(state="normal")
+                self.tabs.set("Results")
+                messagebox.showwarning(
+                    "PTT Finished",
+                    f"Generated {len(pdfs)} PDF file(s).\n"
+                    f"{failed} row(s) failed – see the Results tab.",
+                )
+            else:
+                messagebox.showinfo("PTT Finished", f"Generated {len(pdfs)} PDF file(s).")
 
         self.after(0, _ui_done)
 
@@ -232,11 +407,37 @@ class GAOfficeHelper(ctk.CTk):
 
     # ───── close ─────
     def on_closing(self) -> None:
+        if self._busy:
+            if not messagebox.askyesno(
+                "PTT Running",
+                "A PTT batch is still running.\n"
+                "Stop after the current document and close?",
+            ):
+                return
+            self.engine.cancel()
+            self.status_var.set("Stopping after the current document…")
+            self._close_when_idle()
+            return
+        self.engine.shutdown()             # let Word quit on its own thread
         self.destroy()
         sys.exit(0)
 
+    def _close_when_idle(self) -> None:
+        # keep Tk running so the engine thread can post its last updates
+        if self._busy:
+            self.after(200, self._close_when_idle)
+        else:
+            self.on_closing()
+
 
 # ───────────────────────── run ─────────────────────────
 if __name__ == "__main__":
+    if "--serve" in sys.argv:                  # headless shared-engine mode
+        from ptt_service import main as serve_main
+        sys.exit(serve_main([a for a in sys.argv[1:] if a != "--serve"]))
+    if "--watch" in sys.argv:                  # headless drop-folder mode
+        from watch_folder import main as watch_main
+        sys.exit(watch_main([a for a in sys.argv[1:] if a != "--watch"]))
+
     app = GAOfficeHelper()
     app.mainloop()
@@ -8,13 +8,17 @@ Parse tab-delimited rows copied from Google Sheets / Excel that may contain
 * **Missing trailing columns** (we only rely on a subset anyway).
 
 The module exports `parse_ptt_rows_from_text` which returns plain Python data
-that the rest of GA Office Helper consumes.
+that the rest of GA Office Helper consumes, plus `group_records_by_flight`
+for the flight-consolidated PTT mode.
 """
 
 from __future__ import annotations
 import csv
+import math
 from io import StringIO
-from typing import List, Dict
+from typing import Any, List, Dict, Tuple
+
+from airline_map import AIRLINE_MAP          # local module
 
 
 # ---------------------------------------------------------------------------
@@ -76,3 +80,79 @@ def parse_ptt_rows_from_text(raw_text: str) -> List[Dict[str, str]]:
     return records
 
 
+# ---------------------------------------------------------------------------
+#  Flight consolidation
+# ---------------------------------------------------------------------------
+def parse_pieces(raw: str) -> int:
+    """`"1,204 PCS"` → 1204.  Raises ValueError on anything else."""
+    txt = raw.upper().replace(",", "").replace("PCS", "").replace("PC", "").strip()
+    if not (txt.isascii() and txt.isdigit()):        # "²" passes isdigit()
+        raise ValueError(f"pieces must be a whole number, got {raw!r}")
+    value = int(txt)
+    if value <= 0:
+        raise ValueError(f"pieces must be at least 1, got {raw!r}")
+    return value
+
+
+def parse_weight(raw: str) -> float:
+    """`"1,250.5 KG"` → 1250.5.  Raises ValueError on anything else."""
+    txt = raw.upper().replace(",", "").replace("KGS", "").replace("KG", "").strip()
+    try:
+        value = float(txt)
+    except ValueError:
+        raise ValueError(f"weight must be a number, got {raw!r}") from None
+    if not math.isfinite(value) or value <= 0:   # inf / nan / 0 / -0 / negative
+        raise ValueError(f"weight must be a positive number, got {raw!r}")
+    return value
+
+
+def group_records_by_flight(
+    records: List[Dict[str, str]],
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, Dict[str, str], str]]]:
+    """
+    Consolidate *records* (as returned by `parse_ptt_rows_from_text`) into one
+    group per flight + airline prefix, in a single pass.
+
+    Returns ``(groups, errors)``:
+
+    * groups – in first-seen order, each
+      ``{"flt", "prefix", "airline", "mawbs", "pieces", "weight", "records"}``
+      with *pieces* / *weight* already summed.
+    * errors – ``(row_index, record, message)`` for rows with a blank MAWB
+      or flight, or whose pieces or weight could not be read; those rows
+      are left out of every group.
+    """
+    groups: dict[tuple[str, str], dict[str, Any]] = {}
+    errors: list[tuple[int, dict[str, str], str]] = []
+
+    for idx, rec in enumerate(records):
+        mawb = rec["mawb"].strip()
+        if not mawb:
+            errors.append((idx, rec, f"row {idx + 1}: MAWB is blank"))
+            continue
+        mawb = mawb.splitlines()[0].strip()
+
+        flt = "".join(rec["flt"].split()).upper()
+        try:
+            if not flt:
+                raise ValueError("flight is blank")
+            pcs = parse_pieces(rec["pieces"])
+            wt  = parse_weight(rec["weight"])
+        except ValueError as e:
+            errors.append((idx, rec, f"MAWB {mawb}: {e}"))
+            continue
+
+        prefix = mawb[:3]
+        grp = groups.get((flt, prefix))
+        if grp is None:
+            grp = groups[(flt, prefix)] = {
+                "flt": flt, "prefix": prefix,
+                "airline": AIRLINE_MAP.get(prefix, "Unknown Airline"),
+                "mawbs": [], "pieces": 0, "weight": 0.0, "records": [],
+            }
+        grp["mawbs"].append(mawb)
+        grp["pieces"] += pcs
+        grp["weight"] += wt
+        grp["records"].append(rec)
+
+    return list(groups.values()), errors
@@ -0,0 +1,163 @@
+"""
+ptt_engine.py – warm, single-thread generation engine for the GUI
+=================================================================
+
+The GUI used to import docxtpl / docx2pdf, read the template and start
+Word only when “Generate PTT Docs” was pressed.  `PTTEngine` owns one
+long-lived worker thread instead:
+
+• `warm_up()` queues the warm-up as the thread's first job – import the
+  generation modules, validate the template, prepare the output folder
+  and open Word – at idle priority.
+• `submit()` queues generation jobs on the same thread, so a job that
+  arrives mid warm-up simply waits for it rather than starting a second
+  Word / template load; the thread is raised back to normal priority so
+  the rest of the warm-up cannot be starved by a busy desktop.
+• `cancel()` (also done by `shutdown()`) sets `stopping`; jobs pass it to
+  the generators as *stop* so a running batch ends after the current
+  document and Word is never left behind by a half-finished batch.
+• The thread keeps its converter until `shutdown()`; the converter itself
+  restarts Word if it crashes.
+• A job that raises is reported to its *on_error* callback, so the caller
+  can reset its progress display instead of waiting forever.
+"""
+
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+from typing import Callable, Optional
+
+# ---------------------------------------------------------------------------
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _THREAD_PRIORITY_IDLE   = -15
+    _THREAD_PRIORITY_NORMAL = 0
+    _THREAD_SET_INFORMATION = 0x0020
+
+    _k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _k32.GetCurrentThread.restype = wintypes.HANDLE
+    _k32.OpenThread.restype = wintypes.HANDLE
+    _k32.OpenThread.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    _k32.SetThreadPriority.argtypes = (wintypes.HANDLE, ctypes.c_int)
+    _k32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    def _set_priority(level: int, thread_id: Optional[int] = None) -> None:
+        """Set the calling thread's priority, or that of *thread_id*."""
+        if thread_id is None:
+            _k32.SetThreadPriority(_k32.GetCurrentThread(), level)
+            return
+        handle = _k32.OpenThread(_THREAD_SET_INFORMATION, False, thread_id)
+        if handle:
+            try:
+                _k32.SetThreadPriority(handle, level)
+            finally:
+                _k32.CloseHandle(handle)
+
+else:  # no portable per-thread priority – warm-up just runs normally
+    _THREAD_PRIORITY_IDLE = _THREAD_PRIORITY_NORMAL = 0
+
+    def _set_priority(level: int, thread_id: Optional[int] = None) -> None: ...
+# ---------------------------------------------------------------------------
+
+
+class PTTEngine:
+    """
+    One generation thread with a warm converter.
+
+    *on_status* is called from the engine thread with a short message
+    whenever readiness changes (the GUI marshals it onto Tk).
+    """
+
+    def __init__(self, on_status: Optional[Callable[[str], None]] = None) -> None:
+        self._on_status = on_status or (lambda _msg: None)
+        self._jobs: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._warm_queued = False
+        self.ready = threading.Event()           # set once warm-up finished
+        self.stopping = threading.Event()        # set by cancel()
+        self._urgent = threading.Event()         # a job waits on warm-up
+        self.converter = None                    # fill_ptt.Converter or None
+        self._thread = threading.Thread(target=self._run, name="ptt-engine",
+                                        daemon=True)
+        self._thread.start()
+
+    # ───── public API ─────
+    def warm_up(self) -> None:
+        """Queue the warm-up once; later calls are no-ops."""
+        with self._lock:
+            if self._warm_queued:
+                return
+            self._warm_queued = True
+        self._jobs.put((lambda _converter: self._warm(), None))
+
+    def submit(self, job: Callable[[object], None],
+               on_error: Optional[Callable[[Exception], None]] = None) -> None:
+        """
+        Run ``job(converter)`` on the engine thread.  Warms up first if
+        that has not been queued yet; otherwise waits behind it.  If the job
+        raises, ``on_error(exc)`` is called from the engine thread.
+        """
+        if not self.ready.is_set():
+            self._on_status("Waiting for warm-up to finish…")
+            self._urgent.set()                   # seen by _warm if it starts later
+            _set_priority(_THREAD_PRIORITY_NORMAL, self._thread.native_id)
+        self.warm_up()
+        self._jobs.put((job, on_error))
+
+    def cancel(self) -> None:
+        """Let a running batch end after its current document."""
+        self.stopping.set()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        `cancel()`, then close the converter (Word) on its own thread.  With
+        a batch in flight, cancel and wait for it first – otherwise the
+        join may time out and leave Word running.
+        """
+        self.cancel()
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    # ───── engine thread ─────
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._jobs.get()
+                if item is None:
+                    break
+                job, on_error = item
+                try:
+                    job(self.converter)
+                except Exception as e:           # noqa: BLE001
+                    print(f"[WARN] engine job failed: {e}")
+                    if on_error is not None:
+                        try:
+                            on_error(e)
+                        except Exception as cb_err:   # noqa: BLE001
+                            print(f"[WARN] engine error callback failed: {cb_err}")
+        finally:
+            if self.converter is not None:
+                self.converter.close()
+
+    def _warm(self) -> None:
+        self._on_status("Warming up PTT engine…")
+        if not self._urgent.is_set():
+            _set_priority(_THREAD_PRIORITY_IDLE)
+            if self._urgent.is_set():            # submit() raced the line above
+                _set_priority(_THREAD_PRIORITY_NORMAL)
+        try:
+            import fill_ptt                      # pulls in docxtpl / docx2pdf
+
+            fill_ptt.warm_up()
+            self.converter = fill_ptt.make_converter()   # None → docx2pdf
+            self._on_status("Ready — PTT engine warm.")
+        except Exception as e:                   # noqa: BLE001
+            print(f"[WARN] warm-up failed: {e}")
+            self._on_status(f"Warm-up failed: {e}")
+        finally:
+            _set_priority(_THREAD_PRIORITY_NORMAL)
+            self.ready.set()
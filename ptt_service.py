@@ -0,0 +1,367 @@
+"""
+ptt_service.py – local HTTP generation service for GA Office Helper
+===================================================================
+
+One warm engine that other programs on this PC (scripts, the TMS export
+hook) can share instead of each starting Word:
+
+• Parses and generates through the same `parse_rows` / `fill_ptt`
+  functions the GUI uses.
+• asyncio front-end (many clients at once) + a fixed pool of worker
+  threads; each worker keeps its own Word instance open, and the template
+  is loaded once at start-up.
+• Every /generate job renders into its own scratch folder; finished PDFs
+  are then moved into the output folder under a name no other request
+  holds (``PTT_<mawb>_2.pdf`` … on collision).
+• Runs anywhere for testing – pass ``converter_factory`` returning a stub
+  ``(docx_path, pdf_path) -> None`` callable and bind to 127.0.0.1.
+
+Endpoints (JSON in / JSON out)
+------------------------------
+GET  /health     → {"status": "ok", "workers": N, "pending": k}
+POST /parse      {"text": "<pasted rows>"} → {"records": [...]}
+POST /generate   {"text": "..."} or {"records": [...]},
+                 optional "op_name", "consolidate": bool, "compact": bool,
+                 "return": "paths" (default) | "bytes"
+                 → {"pdfs": [...], "results": [...]}
+                 with "return": "bytes" each result carries "pdf_b64"
+                 instead of "pdf" (nothing is kept on disk).
+
+By default it binds to 127.0.0.1.  ``--host 0.0.0.0`` exposes it to the
+LAN, but there is no authentication and "paths" results name files on
+*this* machine – remote clients should send ``"return": "bytes"``, and
+only on a trusted network.
+
+Run:  python ptt_service.py --port 8765 --workers 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from parse_rows import parse_ptt_rows_from_text, group_records_by_flight
+from fill_ptt import (
+    Converter,
+    generate_flight_summaries,
+    generate_ptt_for_records,
+    claim_unique_path,
+    get_output_folder,
+    load_template_bytes,
+    make_converter,
+)
+
+# ---------------------------------------------------------------------------
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY     = 32 * 1024 * 1024                  # bytes
+RECORD_KEYS  = ("mawb", "flt", "pieces", "weight")
+# ---------------------------------------------------------------------------
+
+
+class BadRequest(ValueError):
+    """Client sent something we cannot work with (→ HTTP 400)."""
+
+
+# ───────────────────────── worker pool ─────────────────────────
+class _WorkerPool:
+    """
+    Fixed worker threads fed from one queue.  Each thread builds its
+    converter once, reuses it for every job and closes it on shutdown –
+    Word objects must stay on the thread that created them.
+    """
+
+    def __init__(self, size: int,
+                 converter_factory: Callable[[], Optional[Converter]]) -> None:
+        self._jobs: queue.Queue = queue.Queue()
+        self._factory = converter_factory
+        self._threads = [
+            threading.Thread(target=self._run, name=f"ptt-worker-{n}", daemon=True)
+            for n in range(size)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _run(self) -> None:
+        try:
+            converter = self._factory()
+        except Exception as e:                   # noqa: BLE001
+            print(f"[WARN] converter start failed, using docx2pdf: {e}")
+            converter = None
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                fn, args, loop, fut = job
+                try:
+                    res = fn(*args, converter)
+                except BaseException as e:       # noqa: BLE001
+                    loop.call_soon_threadsafe(_set_exception, fut, e)
+                else:
+                    loop.call_soon_threadsafe(_set_result, fut, res)
+        finally:
+            if converter is not None and hasattr(converter, "close"):
+                converter.close()
+
+    def submit(self, fn: Callable, *args) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._jobs.put((fn, args, loop, fut))
+        return fut
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            self._jobs.put(None)
+        for t in self._threads:
+            t.join()
+
+
+def _set_result(fut: asyncio.Future, res: Any) -> None:
+    if not fut.cancelled():
+        fut.set_result(res)
+
+
+def _set_exception(fut: asyncio.Future, exc: BaseException) -> None:
+    if not fut.cancelled():
+        fut.set_exception(exc)
+
+
+# ───────────────────────── job bodies (worker threads) ─────────────────────
+def _records_from_payload(payload: dict) -> list[dict]:
+    if "records" in payload:
+        recs = payload["records"]
+        if not isinstance(recs, list) or not all(
+            isinstance(r, dict) and all(isinstance(r.get(k), str) for k in RECORD_KEYS)
+            for r in recs
+        ):
+            raise BadRequest(f"'records' must be a list of objects with "
+                             f"string fields {', '.join(RECORD_KEYS)}")
+        blank = [n for n, r in enumerate(recs) if not r["mawb"].strip()]
+        if blank:
+            raise BadRequest(f"records {blank} have a blank 'mawb'")
+        return [{k: r[k] for k in RECORD_KEYS} for r in recs]
+    if isinstance(payload.get("text"), str):
+        return parse_ptt_rows_from_text(payload["text"])
+    raise BadRequest("expected 'text' or 'records'")
+
+
+def _options_from_payload(payload: dict) -> tuple[str, bool, bool, bool]:
+    """``(op_name, consolidate, compact, want_bytes)`` – strictly typed."""
+    op_name = payload.get("op_name", "")
+    if not isinstance(op_name, str):
+        raise BadRequest("'op_name' must be a string")
+    for key in ("consolidate", "compact"):
+        if not isinstance(payload.get(key, False), bool):   # "false" is truthy
+            raise BadRequest(f"'{key}' must be true or false")
+    ret = payload.get("return", "paths")
+    if ret not in ("paths", "bytes"):
+        raise BadRequest("'return' must be \"paths\" or \"bytes\"")
+    return (op_name, payload.get("consolidate", False),
+            payload.get("compact", False), ret == "bytes")
+
+
+def _generate_job(payload: dict, outdir: Optional[str],
+                  converter: Optional[Converter]) -> dict:
+    op_name, consolidate, compact, want_bytes = _options_from_payload(payload)
+    records = _records_from_payload(payload)
+
+    results: list[dict] = []
+    if consolidate:
+        groups, errors = group_records_by_flight(records)
+        results += [{"index": idx, "record": rec, "status": "failed",
+                     "error": msg, "pdf": ""} for idx, rec, msg in errors]
+        generate, jobs = generate_flight_summaries, groups
+    else:
+        generate, jobs = generate_ptt_for_records, records
+
+    def _run(folder: str) -> None:
+        generate(jobs, op_name, on_result=results.append,
+                 converter=converter, outdir=folder,
+                 compact=compact)
+        if want_bytes:
+            for res in results:
+                if res["pdf"]:
+                    res["pdf_b64"] = base64.b64encode(
+                        Path(res["pdf"]).read_bytes()).decode("ascii")
+
+    if want_bytes:                               # nothing left on disk
+        with tempfile.TemporaryDirectory(prefix="ptt_") as tmp:
+            _run(tmp)
+        pdfs = []
+        for res in results:
+            res.pop("pdf", None)
+    else:
+        # private scratch folder on the same volume, then claim final names
+        final = Path(outdir or get_output_folder())
+        work = Path(tempfile.mkdtemp(prefix=".ptt_job_", dir=final))
+        try:
+            _run(str(work))
+            pdfs = []
+            for res in results:
+                if res["pdf"]:
+                    dest = claim_unique_path(final / Path(res["pdf"]).name)
+                    os.replace(res["pdf"], dest)
+                    res["pdf"] = str(dest)
+                    pdfs.append(str(dest))
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    for res in results:                          # drop the internal group rows
+        res["record"] = {k: res["record"].get(k, "") for k in RECORD_KEYS}
+    return {"pdfs": pdfs, "results": results}
+
+
+# ───────────────────────── HTTP front-end ─────────────────────────
+class PTTService:
+    """asyncio HTTP server around a warm `_WorkerPool`."""
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = 2,
+        converter_factory: Callable[[], Optional[Converter]] = make_converter,
+        outdir: Optional[str] = None,
+    ) -> None:
+        self.host, self.port = host, port
+        self.workers = workers
+        self.outdir = outdir
+        self._factory = converter_factory
+        self._pool: Optional[_WorkerPool] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._pending = 0
+
+    # ---- lifecycle --------------------------------------------------------
+    async def start(self) -> None:
+        load_template_bytes()                    # fail fast + keep it warm
+        self._pool = _WorkerPool(self.workers, self._factory)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]   # port=0 → real one
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._pool.shutdown)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"PTT service listening on http://{self.host}:{self.port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    # ---- request handling -------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        try:
+            status, body = await self._dispatch(reader)
+        except BadRequest as e:
+            status, body = 400, {"error": str(e)}
+        except Exception as e:                   # noqa: BLE001
+            status, body = 500, {"error": str(e)}
+
+        data = json.dumps(body).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                  413: "Payload Too Large"}.get(status, "Internal Server Error")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> tuple[int, dict]:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            method, path = request_line[0], request_line[1]
+        except (IndexError, UnicodeDecodeError):
+            raise BadRequest("malformed request line") from None
+
+        headers: dict[str, str] = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise BadRequest("Content-Length must be an integer") from None
+        if length < 0:
+            raise BadRequest("Content-Length must not be negative")
+        if length > MAX_BODY:
+            return 413, {"error": f"body larger than {MAX_BODY} bytes"}
+        try:
+            raw = await reader.readexactly(length) if length else b""
+        except asyncio.IncompleteReadError:
+            raise BadRequest("body shorter than Content-Length") from None
+
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "workers": self.workers,
+                         "pending": self._pending}
+
+        if method == "POST" and path in ("/parse", "/generate"):
+            try:
+                payload = json.loads(raw or b"{}")
+            except json.JSONDecodeError as e:
+                raise BadRequest(f"invalid JSON: {e}") from None
+            if not isinstance(payload, dict):
+                raise BadRequest("JSON body must be an object")
+
+            if path == "/parse":
+                return 200, {"records": _records_from_payload(payload)}
+
+            self._pending += 1
+            try:
+                res = await self._pool.submit(_generate_job, payload, self.outdir)
+            finally:
+                self._pending -= 1
+            return 200, res
+
+        return 404, {"error": f"no route for {method} {path}"}
+
+
+# ───────────────────────── CLI ─────────────────────────
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="GA Office Helper PTT service")
+    ap.add_argument("--host", default=DEFAULT_HOST,
+                    help="interface to bind (default: 127.0.0.1 – this PC only; "
+                         "no authentication)")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, default=2,
+                    help="parallel Word instances (default: 2)")
+    ap.add_argument("--outdir", default=None,
+                    help="where 'paths' requests save PDFs "
+                         "(default: GeneratedDocuments)")
+    args = ap.parse_args(argv)
+
+    service = PTTService(args.host, args.port, args.workers, outdir=args.outdir)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":                         # pragma: no cover
+    sys.exit(main())
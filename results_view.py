@@ -0,0 +1,219 @@
+# results_view.py ─ per-row results grid for GA Office Helper
+# ============================================================
+"""
+A virtualised results list for PTT batches.
+
+• Only the rows that are currently visible are drawn – a fixed pool of
+  canvas text items is recycled while scrolling, so 100k results cost the
+  same to display as 20.
+• Worker threads call `ResultsGrid.post()` (thread-safe); the grid drains
+  the backlog on a single `after()` tick instead of one callback per row.
+• `failed_records()` hands the original parsed rows back for a re-run.
+• The Row column shows each record's ``"row"`` (its number among the
+  pasted rows) when the caller set one, so re-runs and flight groups keep
+  the numbers of the first run.
+"""
+
+from __future__ import annotations
+
+import tkinter as tk
+from collections import deque
+from typing import Callable, List, Optional
+
+import customtkinter as ctk
+
+ROW_H    = 22                     # px per row
+FLUSH_MS = 120                    # how often posted results are drained
+
+# (header, width in px) – the last column stretches
+COLUMNS = (("Row", 60), ("MAWB", 170), ("Flight", 110), ("Status", 80),
+           ("Error / PDF", 0))
+
+STATUS_COLORS = {"ok": "#7bd88f", "failed": "#ff6b6b"}
+TEXT_COLOR    = "#dcdcdc"
+BG_EVEN       = "#242424"
+BG_ODD        = "#2b2b2b"
+
+
+def _row_label(res: dict) -> str:
+    """
+    Pasted row number(s) behind *res* – stable across re-runs and the same
+    for per-row and per-flight results (``"4 +2"`` = rows 4 and two more).
+    """
+    rec = res["record"]
+    rows = [r.get("row") for r in rec.get("records", [rec])]
+    if not all(rows):                        # caller did not number the rows
+        return str(res["index"] + 1)
+    return str(rows[0]) + (f" +{len(rows) - 1}" if len(rows) > 1 else "")
+
+
+class ResultsGrid(ctk.CTkFrame):
+    """Scrollable, virtualised table of `generate_ptt_for_records` results."""
+
+    def __init__(self, master, on_change: Optional[Callable[[], None]] = None,
+                 on_activate: Optional[Callable[[dict], None]] = None,
+                 **kw) -> None:
+        super().__init__(master, **kw)
+        self._on_change = on_change
+        self._on_activate = on_activate
+
+        self._rows: List[dict] = []          # every result, in arrival order
+        self._view: List[int] = []           # indexes into _rows being shown
+        self._pending: deque = deque()       # filled by worker threads
+        self._failed_only = False
+        self._top = 0                        # first visible row in _view
+        self._slots: list[tuple[int, list[int]]] = []   # (bg rect, [texts])
+
+        # header
+        self._header = tk.Canvas(self, height=ROW_H, highlightthickness=0,
+                                 bg="#1f1f1f")
+        self._header.grid(row=0, column=0, sticky="ew")
+
+        # body + scrollbar
+        self._canvas = tk.Canvas(self, highlightthickness=0, bg=BG_EVEN)
+        self._canvas.grid(row=1, column=0, sticky="nsew")
+        self._sb = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._sb.grid(row=1, column=1, sticky="ns")
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._canvas.bind("<Configure>", lambda _e: self._layout())
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self._canvas.bind(seq, self._on_wheel)
+        self._canvas.bind("<Double-Button-1>", self._on_double_click)
+
+        self.after(FLUSH_MS, self._flush)
+
+    # ───── public API ─────
+    def post(self, result: dict) -> None:
+        """Queue one result – safe to call from any thread."""
+        self._pending.append(result)
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._rows.clear()
+        self._view.clear()
+        self._top = 0
+        self._redraw()
+
+    def set_failed_only(self, flag: bool) -> None:
+        self._failed_only = bool(flag)
+        self._view = [i for i, r in enumerate(self._rows) if self._visible(r)]
+        self._top = 0
+        self._redraw()
+
+    def counts(self) -> tuple[int, int]:
+        """Return ``(ok, failed)`` for everything received so far."""
+        failed = sum(1 for r in self._rows if r["status"] == "failed")
+        return len(self._rows) - failed, failed
+
+    def failed_records(self) -> List[dict]:
+        return [r["record"] for r in self._rows if r["status"] == "failed"]
+
+    def row_at(self, y: int) -> Optional[dict]:
+        """Result under canvas y-coordinate *y*."""
+        pos = self._top + y // ROW_H
+        return self._rows[self._view[pos]] if 0 <= pos < len(self._view) else None
+
+    def _on_double_click(self, event) -> None:
+        res = self.row_at(event.y)
+        if res is not None and self._on_activate:
+            self._on_activate(res)
+
+    # ───── batching ─────
+    def _flush(self) -> None:
+        if self._pending:
+            follow = self._top + self._page() >= len(self._view)
+            while self._pending:
+                res = self._pending.popleft()
+                self._rows.append(res)
+                if self._visible(res):
+                    self._view.append(len(self._rows) - 1)
+            if follow:                          # keep tailing the newest rows
+                self._top = max(0, len(self._view) - self._page())
+            self._redraw()
+            if self._on_change:
+                self._on_change()
+        self.after(FLUSH_MS, self._flush)
+
+    def _visible(self, res: dict) -> bool:
+        return not self._failed_only or res["status"] == "failed"
+
+    # ───── geometry / scrolling ─────
+    def _page(self) -> int:
+        return max(1, self._canvas.winfo_height() // ROW_H)
+
+    def _col_x(self) -> list[int]:
+        xs, x = [], 6
+        for _name, width in COLUMNS:
+            xs.append(x)
+            x += width
+        return xs
+
+    def _layout(self) -> None:
+        """(Re)build the pool of row slots to fit the current height."""
+        self._canvas.delete("all")
+        self._header.delete("all")
+        width = self._canvas.winfo_width()
+        xs = self._col_x()
+
+        for (name, _w), x in zip(COLUMNS, xs):
+            self._header.create_text(x, ROW_H // 2, text=name, anchor="w",
+                                     fill=TEXT_COLOR, font=("", 10, "bold"))
+
+        self._slots = []
+        for n in range(self._page() + 1):
+            y = n * ROW_H
+            bg = self._canvas.create_rectangle(0, y, width, y + ROW_H, width=0,
+                                               fill=BG_EVEN if n % 2 == 0 else BG_ODD)
+            texts = [self._canvas.create_text(x, y + ROW_H // 2, anchor="w",
+                                              fill=TEXT_COLOR, text="")
+                     for x in xs]
+            self._slots.append((bg, texts))
+        self._redraw()
+
+    def _redraw(self) -> None:
+        total = len(self._view)
+        self._top = max(0, min(self._top, total - self._page()))
+
+        for n, (_bg, texts) in enumerate(self._slots):
+            pos = self._top + n
+            if pos >= total:
+                for t in texts:
+                    self._canvas.itemconfigure(t, text="")
+                continue
+            res = self._rows[self._view[pos]]
+            rec = res["record"]
+            detail = res["error"] if res["status"] == "failed" else res["pdf"]
+            values = (_row_label(res),
+                      rec.get("mawb", "").splitlines()[0] if rec.get("mawb") else "",
+                      rec.get("flt", ""), res["status"], detail)
+            for t, val in zip(texts, values):
+                self._canvas.itemconfigure(t, text=val, fill=TEXT_COLOR)
+            self._canvas.itemconfigure(texts[3], fill=STATUS_COLORS.get(res["status"],
+                                                                        TEXT_COLOR))
+
+        if total:
+            self._sb.set(self._top / total,
+                         min(1.0, (self._top + self._page()) / total))
+        else:
+            self._sb.set(0.0, 1.0)
+
+    def _on_scrollbar(self, *args) -> None:
+        total = len(self._view)
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self._page() if args[2] == "pages" else 1
+            self._top += int(args[1]) * step
+        self._redraw()
+
+    def _on_wheel(self, event) -> None:
+        if getattr(event, "num", None) == 4:
+            delta = -3
+        elif getattr(event, "num", None) == 5:
+            delta = 3
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self._top += delta
+        self._redraw()
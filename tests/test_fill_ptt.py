@@ -0,0 +1,149 @@
+"""fill_ptt without Word: WordConverter on a fake COM layer, pypdf post-processing."""
+
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("docxtpl")
+pytest.importorskip("docx2pdf")
+
+import fill_ptt  # noqa: E402
+
+
+class ComError(Exception):
+    pass
+
+
+class FakeWord:
+    """Stands in for Word.Application; `dead` mimics a killed process."""
+
+    def __init__(self, started):
+        started.append(self)
+        self.dead, self.saved = False, []
+        self.Documents = self
+
+    def Open(self, path, **_kw):
+        if self.dead:
+            raise ComError("The RPC server is unavailable.")
+        return types.SimpleNamespace(
+            SaveAs=lambda pdf, FileFormat: self.saved.append(pdf),
+            Close=lambda _save: None,
+        )
+
+    def Quit(self):
+        if self.dead:
+            raise ComError("The RPC server is unavailable.")
+
+
+@pytest.fixture
+def started(monkeypatch):
+    started = []
+    client = types.SimpleNamespace(DispatchEx=lambda _prog: FakeWord(started))
+    monkeypatch.setitem(sys.modules, "win32com", types.SimpleNamespace(client=client))
+    monkeypatch.setitem(sys.modules, "win32com.client", client)
+    monkeypatch.setitem(sys.modules, "pywintypes",
+                        types.SimpleNamespace(com_error=ComError))
+    return started
+
+
+def test_dead_word_is_replaced_and_the_file_retried(started, tmp_path):
+    conv = fill_ptt.WordConverter()
+    conv(str(tmp_path / "a.docx"), str(tmp_path / "a.pdf"))
+    started[0].dead = True                     # user killed WINWORD.EXE
+
+    conv(str(tmp_path / "b.docx"), str(tmp_path / "b.pdf"))
+
+    assert len(started) == 2
+    assert [p.endswith("b.pdf") for p in started[1].saved] == [True]
+    conv.close()
+
+
+def test_close_tolerates_a_dead_word(started):
+    conv = fill_ptt.WordConverter()
+    started[0].dead = True
+    conv.close()
+
+
+# ───── compact / merged output ─────
+def _logo_pdf(path):
+    """One page drawing a large, uncompressed form XObject (think: the logo)."""
+    pypdf = pytest.importorskip("pypdf")
+    from pypdf.generic import (ArrayObject, DecodedStreamObject, DictionaryObject,
+                               NameObject, NumberObject)
+
+    writer = pypdf.PdfWriter()
+    page = writer.add_blank_page(612, 792)
+    logo = DecodedStreamObject()
+    logo.set_data(b"0 0 m 100 100 l S\n" * 500)
+    logo.update({
+        NameObject("/Type"): NameObject("/XObject"),
+        NameObject("/Subtype"): NameObject("/Form"),
+        NameObject("/BBox"): ArrayObject([NumberObject(n) for n in (0, 0, 612, 792)]),
+    })
+    page[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/XObject"): DictionaryObject({NameObject("/Logo"): writer._add_object(logo)}),
+    })
+    content = DecodedStreamObject()
+    content.set_data(b"q /Logo Do Q\n" * 200)
+    page[NameObject("/Contents")] = writer._add_object(content)
+    writer.write(str(path))
+    return path
+
+
+def test_compact_pdf_shrinks_once_then_leaves_the_file_alone(tmp_path):
+    pdf = _logo_pdf(tmp_path / "a.pdf")
+    before = pdf.stat().st_size
+
+    fill_ptt.compact_pdf(str(pdf))
+    after = pdf.stat().st_size
+    assert after < before
+
+    fill_ptt.compact_pdf(str(pdf))             # nothing left to gain
+    assert pdf.stat().st_size == after
+
+
+def test_merged_batch_stores_identical_resources_once(tmp_path):
+    pypdf = pytest.importorskip("pypdf")
+    a, b = _logo_pdf(tmp_path / "a.pdf"), _logo_pdf(tmp_path / "b.pdf")
+    dest = tmp_path / "batch.pdf"
+
+    fill_ptt.merge_pdfs([str(a), str(b)], str(dest))
+
+    assert len(pypdf.PdfReader(str(dest)).pages) == 2
+    assert dest.stat().st_size < 2 * a.stat().st_size
+
+
+def test_failed_compaction_keeps_the_row_and_its_pdf(tmp_path, monkeypatch):
+    def no_pypdf(_pdf_path):
+        raise RuntimeError("compact / merged PDF output needs pypdf")
+
+    def stub(_docx_path, pdf_path):
+        Path(pdf_path).write_bytes(b"%PDF-stub")
+
+    monkeypatch.setattr(fill_ptt, "compact_pdf", no_pypdf)
+    results = []
+    pdfs = fill_ptt.generate_ptt_for_records(
+        [{"mawb": "016-1", "flt": "UA1", "pieces": "1", "weight": "1"}],
+        on_result=results.append, converter=stub, outdir=str(tmp_path), compact=True,
+    )
+
+    assert [r["status"] for r in results] == ["ok"]
+    assert Path(pdfs[0]).read_bytes() == b"%PDF-stub"
+
+
+def test_stop_ends_the_batch_before_the_next_record(tmp_path):
+    stop, calls = threading.Event(), []
+
+    def stub(_docx_path, pdf_path):
+        calls.append(pdf_path)
+        stop.set()                                # operator closes the app
+        Path(pdf_path).write_bytes(b"%PDF-stub")
+
+    recs = [{"mawb": f"016-{n}", "flt": "UA1", "pieces": "1", "weight": "1"}
+            for n in range(3)]
+    pdfs = fill_ptt.generate_ptt_for_records(recs, converter=stub,
+                                             outdir=str(tmp_path), stop=stop)
+    assert len(calls) == 1 and pdfs == calls
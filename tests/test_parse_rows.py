@@ -0,0 +1,47 @@
+import pytest
+
+from parse_rows import group_records_by_flight, parse_pieces, parse_weight
+
+
+def _rec(mawb, flt, pieces="1", weight="2"):
+    return {"mawb": mawb, "flt": flt, "pieces": pieces, "weight": weight}
+
+
+@pytest.mark.parametrize("raw", ["inf", "-inf", "nan", "-0", "0", "-3", "1e400", "kg"])
+def test_parse_weight_rejects(raw):
+    with pytest.raises(ValueError, match="weight"):
+        parse_weight(raw)
+
+
+@pytest.mark.parametrize("raw", ["²", "0", "1.5", "-2", ""])
+def test_parse_pieces_rejects(raw):
+    with pytest.raises(ValueError, match="pieces"):
+        parse_pieces(raw)
+
+
+def test_parse_units_and_separators():
+    assert parse_pieces("1,204 PCS") == 1204
+    assert parse_weight("1,250.5 KG") == 1250.5
+
+
+def test_group_sums_per_flight_and_airline_prefix():
+    groups, errors = group_records_by_flight([
+        _rec("016-1", "UA 1", "2", "10"),
+        _rec("016-2", "ua1", "3", "5.5kg"),
+        _rec("001-3", "UA1", "1", "1"),          # codeshare: other airline
+    ])
+    assert errors == []
+    assert [(g["prefix"], g["flt"], g["pieces"], g["weight"]) for g in groups] == [
+        ("016", "UA1", 5, 15.5),
+        ("001", "UA1", 1, 1.0),
+    ]
+
+
+def test_group_reports_blank_flight_and_mawb():
+    groups, errors = group_records_by_flight([
+        _rec("016-1", ""), _rec("016-2", "  "), _rec("", "UA1"), _rec("016-3", "UA1"),
+    ])
+    assert [g["mawbs"] for g in groups] == [["016-3"]]
+    assert [idx for idx, _rec_, _msg in errors] == [0, 1, 2]
+    assert "flight is blank" in errors[0][2]
+    assert "MAWB is blank" in errors[2][2]
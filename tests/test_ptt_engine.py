@@ -0,0 +1,46 @@
+"""PTTEngine job / error routing (warm-up skipped – no Word or template needed)."""
+
+import threading
+
+from ptt_engine import PTTEngine
+
+
+def _engine(monkeypatch):
+    monkeypatch.setattr(PTTEngine, "_warm", lambda self: self.ready.set())
+    return PTTEngine()
+
+
+def test_failing_job_reaches_on_error_and_engine_keeps_going(monkeypatch):
+    engine = _engine(monkeypatch)
+    errors, ran = [], threading.Event()
+
+    def boom(_converter):
+        raise RuntimeError("merge failed")
+
+    engine.submit(boom, on_error=errors.append)
+    engine.submit(lambda _converter: ran.set())
+    assert ran.wait(5)
+    engine.shutdown()
+
+    assert [str(e) for e in errors] == ["merge failed"]
+
+
+def test_failing_job_without_on_error_is_only_logged(monkeypatch, capsys):
+    engine = _engine(monkeypatch)
+    engine.submit(lambda _converter: 1 / 0)
+    engine.shutdown()
+    assert "engine job failed" in capsys.readouterr().out
+
+
+def test_cancel_is_visible_to_running_jobs(monkeypatch):
+    engine = _engine(monkeypatch)
+    started, seen = threading.Event(), []
+
+    def batch(_converter):
+        started.set()
+        seen.append(engine.stopping.wait(5))     # generators poll this as *stop*
+
+    engine.submit(batch)
+    assert started.wait(5)
+    engine.shutdown()
+    assert seen == [True]
@@ -0,0 +1,141 @@
+"""Localhost tests for ptt_service with a stub converter (no Word needed)."""
+
+import asyncio
+import base64
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("docxtpl")
+pytest.importorskip("docx2pdf")
+
+from ptt_service import PTTService  # noqa: E402
+
+
+def _stub_factory():
+    def convert(docx_path, pdf_path):
+        # echo the rendered text so each PDF is traceable to its request
+        body = Path(docx_path).read_bytes()
+        if zipfile.is_zipfile(docx_path):
+            with zipfile.ZipFile(docx_path) as zf:
+                body = zf.read("word/document.xml")
+        Path(pdf_path).write_bytes(b"%PDF-stub\n" + body)
+    return convert
+
+
+async def _request(port, method, path, body=b"", headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = {"Content-Length": str(len(body)), **(headers or {})}
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n".encode()
+        + "".join(f"{k}: {v}\r\n" for k, v in head.items()).encode()
+        + b"\r\n" + body
+    )
+    await writer.drain()
+    resp = await reader.read()
+    writer.close()
+    status_line, _, payload = resp.partition(b"\r\n\r\n")
+    return int(status_line.split()[1]), json.loads(payload)
+
+
+def _post(port, path, obj):
+    return _request(port, "POST", path, json.dumps(obj).encode())
+
+
+def _serve(tmp_path, scenario):
+    async def main():
+        service = PTTService(port=0, workers=3, converter_factory=_stub_factory,
+                             outdir=str(tmp_path))
+        await service.start()
+        try:
+            return await scenario(service.port)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+def _records(op_tag="", n=1):
+    return [{"mawb": f"016-{i}{op_tag}", "flt": "UA1", "pieces": "2", "weight": "3"}
+            for i in range(n)]
+
+
+def test_concurrent_same_mawb_never_collide(tmp_path):
+    async def scenario(port):
+        return await asyncio.gather(*[
+            _post(port, "/generate", {"records": _records(), "op_name": f"op{n}"})
+            for n in range(8)
+        ])
+
+    responses = _serve(tmp_path, scenario)
+
+    paths = []
+    for n, (status, body) in enumerate(responses):
+        assert status == 200
+        (res,) = body["results"]
+        assert res["status"] == "ok", res["error"]
+        assert body["pdfs"] == [res["pdf"]]
+        assert f"op{n}" in Path(res["pdf"]).read_text(errors="replace")
+        paths.append(res["pdf"])
+    assert len(set(paths)) == 8
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(Path(p).name for p in paths)
+
+
+def test_bytes_mode_returns_content_without_paths(tmp_path):
+    async def scenario(port):
+        return await _post(port, "/generate",
+                           {"records": _records(n=3), "return": "bytes"})
+
+    status, body = _serve(tmp_path, scenario)
+    assert status == 200 and body["pdfs"] == []
+    for res in body["results"]:
+        assert "pdf" not in res
+        assert base64.b64decode(res["pdf_b64"]).startswith(b"%PDF-stub")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_consolidated_codeshare_gets_two_files(tmp_path):
+    recs = _records(n=2) + [{"mawb": "001-9", "flt": "UA1", "pieces": "1", "weight": "1"}]
+
+    async def scenario(port):
+        return await _post(port, "/generate", {"records": recs, "consolidate": True})
+
+    status, body = _serve(tmp_path, scenario)
+    assert status == 200
+    assert len(body["results"]) == 2 and len(set(body["pdfs"])) == 2
+
+
+@pytest.mark.parametrize("path, raw, headers", [
+    ("/generate", json.dumps({"records": [{"mawb": " ", "flt": "UA1", "pieces": "1",
+                                           "weight": "1"}], "consolidate": True}), None),
+    ("/generate", json.dumps({"records": [{"mawb": "016-1"}]}), None),
+    ("/generate", "not json", None),
+    ("/generate", json.dumps({"records": _records(), "return": "byte"}), None),
+    ("/generate", json.dumps({"records": _records(), "consolidate": "false"}), None),
+    ("/generate", json.dumps({"records": _records(), "compact": 1}), None),
+    ("/generate", json.dumps({"records": _records(), "op_name": 7}), None),
+    ("/parse", "{}", {"Content-Length": "abc"}),
+    ("/parse", "{}", {"Content-Length": "-5"}),
+])
+def test_bad_requests_are_400(tmp_path, path, raw, headers):
+    async def scenario(port):
+        return await _request(port, "POST", path, raw.encode(), headers)
+
+    status, body = _serve(tmp_path, scenario)
+    assert status == 400, body
+    assert body["error"]
+
+
+def test_health_and_parse(tmp_path):
+    row = "\t".join(["x"] * 5 + ["016-123"] + ["x"] * 3 + ["UA1", "x", "2", "x", "10"])
+
+    async def scenario(port):
+        return (await _request(port, "GET", "/health"),
+                await _post(port, "/parse", {"text": row}))
+
+    (h_status, health), (p_status, parsed) = _serve(tmp_path, scenario)
+    assert h_status == 200 and health["status"] == "ok"
+    assert p_status == 200
+    assert parsed["records"] == [{"mawb": "016-123", "flt": "UA1",
+                                  "pieces": "2", "weight": "10"}]
@@ -0,0 +1,170 @@
+"""watch_folder on temp directories with a stub converter (no Word needed)."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("docxtpl")
+pytest.importorskip("docx2pdf")
+
+from watch_folder import FolderWatcher  # noqa: E402
+
+
+def _row(mawb, flt="UA1", pieces="2", weight="10"):
+    cols = ["x"] * 14
+    cols[5], cols[9], cols[11], cols[13] = mawb, flt, pieces, weight
+    return "\t".join(cols)
+
+
+class StubConverter:
+    """Writes a fake PDF; fails (or crashes) on chosen MAWBs."""
+
+    def __init__(self, fail=(), crash=()):
+        self.fail, self.crash, self.calls = set(fail), set(crash), []
+
+    def __call__(self, docx_path, pdf_path):
+        name = Path(docx_path).stem
+        self.calls.append(name)
+        if any(m in name for m in self.crash):
+            raise KeyboardInterrupt          # escapes the per-row handler
+        if any(m in name for m in self.fail):
+            raise RuntimeError("Word said no")
+        Path(pdf_path).write_bytes(b"%PDF-stub")
+
+
+def _watcher(inbox, out, conv, **kw):
+    return FolderWatcher(str(inbox), "op", settle=0, converter=conv, outdir=str(out), **kw)
+
+
+def _drain(watcher):
+    watcher.run_once()                       # first sighting
+    return watcher.run_once()                # settled
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    inbox, out = tmp_path / "inbox", tmp_path / "out"
+    out.mkdir()
+    return inbox, out
+
+
+def test_waits_until_file_settles(dirs):
+    inbox, out = dirs
+    conv = StubConverter()
+    w = FolderWatcher(str(inbox), settle=0.3, converter=conv, outdir=str(out))
+    (inbox / "a.txt").write_text(_row("016-1") + "\n")
+    assert w.run_once() == [] and w.run_once() == []
+    time.sleep(0.35)
+    (entry,) = w.run_once()
+    assert entry["status"] == "done" and conv.calls == ["PTT_016-1"]
+    assert (inbox / "done" / "a.txt").exists()
+
+
+def test_restart_after_crash_skips_finished_rows(dirs):
+    inbox, out = dirs
+    inbox.mkdir()
+    (inbox / "a.txt").write_text("\n".join(_row(f"016-{n}") for n in range(4)) + "\n")
+
+    with pytest.raises(KeyboardInterrupt):
+        _drain(_watcher(inbox, out, StubConverter(crash=["016-2"])))
+    assert (inbox / "a.txt").exists()        # never moved
+
+    conv = StubConverter()
+    (entry,) = _drain(_watcher(inbox, out, conv))
+    assert conv.calls == ["PTT_016-2", "PTT_016-3"]
+    assert entry["status"] == "done" and len(entry["pdfs"]) == 4
+
+
+def test_redropped_partial_failure_only_retries_failed_rows(dirs):
+    inbox, out = dirs
+    inbox.mkdir()
+    (inbox / "a.txt").write_text("\n".join(_row(f"016-{n}") for n in range(3)) + "\n")
+
+    (entry,) = _drain(_watcher(inbox, out, StubConverter(fail=["016-1"])))
+    assert entry["status"] == "failed"
+    errors = (inbox / "failed" / "a.txt.errors.txt").read_text()
+    assert "016-1" in errors
+
+    (inbox / "failed" / "a.txt").rename(inbox / "a.txt")      # operator re-drops
+    conv = StubConverter()
+    (entry,) = _drain(_watcher(inbox, out, conv))
+    assert conv.calls == ["PTT_016-1"]
+    assert entry["status"] == "done" and (inbox / "done" / "a.txt").exists()
+
+    (inbox / "done" / "a.txt").rename(inbox / "again.txt")   # same content again
+    conv = StubConverter()
+    (entry,) = _drain(_watcher(inbox, out, conv))
+    assert conv.calls == [] and entry["status"] == "done"
+
+
+def test_bad_rows_go_to_failed_in_consolidated_mode(dirs):
+    inbox, out = dirs
+    inbox.mkdir()
+    (inbox / "b.txt").write_text(_row("016-1") + "\n" + _row("016-2", pieces="zz") + "\n")
+
+    (entry,) = _drain(_watcher(inbox, out, StubConverter(), consolidate=True))
+    assert entry["status"] == "failed" and len(entry["pdfs"]) == 1
+    assert "pieces" in (inbox / "failed" / "b.txt.errors.txt").read_text()
+
+
+def test_merge_never_overwrites_an_earlier_batch(dirs):
+    pypdf = pytest.importorskip("pypdf")
+    inbox, out = dirs
+    inbox.mkdir()
+
+    def blank_pdf(_docx_path, pdf_path):
+        writer = pypdf.PdfWriter()
+        writer.add_blank_page(612, 792)
+        writer.write(pdf_path)
+
+    w = _watcher(inbox, out, blank_pdf, merge=True)
+    batches = []
+    for n in range(2):                       # TMS re-uses the export name
+        (inbox / "export.txt").write_text(_row(f"016-{n}") + "\n")
+        (entry,) = _drain(w)
+        batches += entry["pdfs"]
+
+    assert [Path(b).name for b in batches] == ["PTT_BATCH_export.pdf",
+                                               "PTT_BATCH_export_2.pdf"]
+    assert sorted(p.name for p in out.iterdir()) == sorted(Path(b).name for b in batches)
+
+
+def test_same_flight_in_two_exports_keeps_both_summaries(dirs):
+    inbox, out = dirs
+    w = _watcher(inbox, out, StubConverter(), consolidate=True)
+    pdfs = []
+    for name, mawb in (("a.txt", "016-111"), ("b.txt", "016-222")):
+        (inbox / name).write_text(_row(mawb) + "\n")
+        (entry,) = _drain(w)
+        pdfs += entry["pdfs"]
+
+    assert len(set(pdfs)) == 2 and all(Path(p).exists() for p in pdfs)
+    assert Path(pdfs[1]).stem == Path(pdfs[0]).stem + "_2"
+
+
+def test_merged_retry_extends_the_batch_of_the_first_run(dirs):
+    pypdf = pytest.importorskip("pypdf")
+    inbox, out = dirs
+    inbox.mkdir()
+
+    class BlankPdf(StubConverter):
+        def __call__(self, docx_path, pdf_path):
+            super().__call__(docx_path, pdf_path)
+            writer = pypdf.PdfWriter()
+            writer.add_blank_page(612, 792)
+            writer.write(pdf_path)
+
+    rows = "\n".join(_row(f"016-{n}") for n in range(3)) + "\n"
+    batches = []
+    for conv in (BlankPdf(fail=["016-1"]), BlankPdf(fail=["016-1"]), BlankPdf()):
+        (inbox / "a.txt").write_text(rows)   # operator re-drops the export
+        (entry,) = _drain(_watcher(inbox, out, conv, merge=True))
+        batches.append((entry["status"], entry["pdfs"],
+                        len(pypdf.PdfReader(entry["batch"]).pages)))
+        (inbox / ("failed" if entry["status"] == "failed" else "done") / "a.txt").unlink()
+
+    batch = str(out / "PTT_BATCH_a.pdf")
+    assert batches == [("failed", [batch], 2), ("failed", [batch], 2),
+                       ("done", [batch], 3)]
+    assert [p.name for p in out.iterdir()] == ["PTT_BATCH_a.pdf"]
@@ -0,0 +1,324 @@
+"""
+watch_folder.py – drop-folder daemon for GA Office Helper
+=========================================================
+
+Watches an inbox (e.g. the share the TMS exports to) and feeds every new
+PTT export through `parse_ptt_rows_from_text` and the PTT generator.
+
+• A file is only picked up once its size and mtime have stopped changing
+  for *settle* seconds, so half-written exports are never read.
+• A JSON-lines journal records every finished row (content hash + row
+  key) as soon as its PDF exists, and every finished file.  After a crash
+  or when a partly failed export is dropped again, rows already done are
+  skipped and only the rest are generated.
+• Inputs end up in ``done/`` or ``failed/`` (next to a ``.errors.txt``
+  listing the rows that failed).
+• ``--compact`` shrinks each PDF; ``--merge`` archives every export as a
+  single ``PTT_BATCH_<name>.pdf`` (``_2``, ``_3`` … if taken).  Rows
+  retried after a partial failure are added to that export's batch.
+
+Plain polling, no file-watcher library – works on Windows shares and Linux.
+
+Run:  python watch_folder.py \\\\server\\ptt_drop --op-name "Night shift"
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from parse_rows import parse_ptt_rows_from_text, group_records_by_flight
+from fill_ptt import (
+    Converter,
+    generate_flight_summaries,
+    generate_ptt_for_records,
+    get_output_folder,
+    make_converter,
+    merge_batch,
+    merge_pdfs,
+)
+
+# ---------------------------------------------------------------------------
+PATTERNS      = ("*.txt", "*.tsv")              # what the TMS drops
+JOURNAL_NAME  = ".ptt_journal.jsonl"
+SETTLE_SECS   = 2.0
+POLL_SECS     = 1.0
+# ---------------------------------------------------------------------------
+
+
+def _read_export(path: Path) -> str:
+    raw = path.read_bytes()
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return raw.decode("cp1252", errors="replace")     # Excel "Text (Tab)"
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _first_line(text: str) -> str:
+    lines = text.strip().splitlines()
+    return lines[0].strip() if lines else ""
+
+
+def _move(src: Path, folder: Path) -> Path:
+    """Move *src* into *folder* without overwriting an earlier file."""
+    folder.mkdir(parents=True, exist_ok=True)
+    dest = folder / src.name
+    if dest.exists():
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        dest = folder / f"{src.stem}_{stamp}{src.suffix}"
+    shutil.move(str(src), str(dest))
+    return dest
+
+
+class FolderWatcher:
+    """Poll *inbox* and generate PTTs for every settled export file."""
+
+    def __init__(
+        self,
+        inbox: str,
+        op_name: str = "",
+        consolidate: bool = False,
+        settle: float = SETTLE_SECS,
+        converter: Optional[Converter] = None,
+        outdir: Optional[str] = None,
+        compact: bool = False,
+        merge: bool = False,
+    ) -> None:
+        self.inbox = Path(inbox)
+        self.done_dir = self.inbox / "done"
+        self.failed_dir = self.inbox / "failed"
+        self.journal_path = self.inbox / JOURNAL_NAME
+        self.op_name = op_name
+        self.consolidate = consolidate
+        self.settle = settle
+        self.converter = converter
+        self.outdir = outdir
+        self.compact = compact
+        self.merge = merge
+
+        self.inbox.mkdir(parents=True, exist_ok=True)
+        self._seen: Dict[Path, Tuple[int, int, float]] = {}   # size, mtime, since
+        self._journal: Dict[str, dict] = {}                   # sha256 → file entry
+        self._rows: Dict[str, Dict[str, str]] = {}            # sha256 → {row: pdf}
+        self._load_journal()
+
+    # ───── journal ─────
+    def _load_journal(self) -> None:
+        if not self.journal_path.exists():
+            return
+        for line in self.journal_path.read_text("utf-8").splitlines():
+            try:
+                self._remember(json.loads(line))
+            except (json.JSONDecodeError, KeyError):         # torn last line
+                continue
+
+    def _remember(self, entry: dict) -> None:
+        if "row" in entry:
+            self._rows.setdefault(entry["sha256"], {})[entry["row"]] = entry["pdf"]
+        else:
+            self._journal[entry["sha256"]] = entry
+
+    def _append_journal(self, entry: dict) -> None:
+        with self.journal_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._remember(entry)
+
+    # ───── scanning ─────
+    def _settled_files(self) -> List[Path]:
+        """Files whose size + mtime have not changed for `settle` seconds."""
+        now = time.monotonic()
+        present = set()
+        ready: list[Path] = []
+
+        for pattern in PATTERNS:
+            for path in sorted(self.inbox.glob(pattern)):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:                    # moved meanwhile
+                    continue
+                present.add(path)
+                sig = (st.st_size, st.st_mtime_ns)
+                prev = self._seen.get(path)
+                if prev is None or prev[:2] != sig:
+                    self._seen[path] = (*sig, now)
+                elif now - prev[2] >= self.settle:
+                    ready.append(path)
+
+        for gone in set(self._seen) - present:
+            del self._seen[gone]
+        return ready
+
+    # ───── processing ─────
+    def process_file(self, path: Path) -> dict:
+        """Generate PTTs for one export, journal it and move it away."""
+        digest = _sha256(path)
+        entry = self._journal.get(digest)
+        if entry is None or entry["status"] != "done":  # failures get retried
+            entry = self._generate(path, digest)
+            self._append_journal(entry)
+
+        target = self.done_dir if entry["status"] == "done" else self.failed_dir
+        dest = _move(path, target)
+        if entry["errors"]:
+            dest.with_name(dest.name + ".errors.txt").write_text(
+                "\n".join(entry["errors"]) + "\n", "utf-8"
+            )
+        self._seen.pop(path, None)
+        return entry
+
+    def _generate(self, path: Path, digest: str) -> dict:
+        errors: list[str] = []
+        pdfs: list[str] = []
+        batch: Optional[str] = None
+        try:
+            records = parse_ptt_rows_from_text(_read_export(path))
+            if not records:
+                errors.append("no valid PTT rows found")
+            else:
+                if self.consolidate:
+                    groups, bad = group_records_by_flight(records)
+                    errors += [msg for _idx, _rec, msg in bad]
+                    generate = generate_flight_summaries
+                    keyed = [(f"flt:{g['prefix']}|{g['flt']}", g) for g in groups]
+                else:
+                    generate = generate_ptt_for_records
+                    keyed = [(f"row:{n}:{_first_line(r['mawb'])}", r)
+                             for n, r in enumerate(records)]
+
+                # rows finished by an earlier (crashed / partly failed) run
+                done = self._rows.get(digest, {})
+                pdfs = [done[key] for key, _job in keyed if key in done]
+                todo = [(key, job) for key, job in keyed if key not in done]
+
+                pdfs += generate(
+                    [job for _key, job in todo], self.op_name,
+                    on_result=self._on_row(digest, [key for key, _job in todo], errors),
+                    converter=self.converter, outdir=self.outdir,
+                    compact=self.compact,
+                )
+            if self.merge:
+                batch = self._merge(path, digest, pdfs)
+                pdfs = [batch] if batch else []
+        except Exception as e:                               # noqa: BLE001
+            errors.append(f"{type(e).__name__}: {e}")
+
+        return {
+            "sha256": digest, "name": path.name,
+            "status": "failed" if errors else "done",
+            "pdfs": pdfs, "batch": batch, "errors": errors,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def _merge(self, path: Path, digest: str, pdfs: List[str]) -> Optional[str]:
+        """
+        One batch per export.  Rows done by an earlier run are already in
+        that run's batch (their single PDFs are gone), so new rows are
+        folded into it; with no new rows the earlier batch stands as is.
+        """
+        prev = self._journal.get(digest, {}).get("batch")
+        batch = prev if prev and Path(prev).exists() else None
+        fresh = [p for p in pdfs if Path(p).exists()]
+        if not fresh:
+            return batch
+        if batch is None:
+            return merge_batch(fresh, self.outdir or get_output_folder(), path.stem)
+
+        tmp = batch + ".tmp"
+        try:
+            merge_pdfs([batch, *fresh], tmp)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        os.replace(tmp, batch)
+        for pdf in fresh:
+            Path(pdf).unlink(missing_ok=True)
+        return batch
+
+    def _on_row(self, digest: str, keys: list[str], errors: list[str]):
+        """Journal each finished row at once; collect failures."""
+        def _on_result(res: dict) -> None:
+            if res["status"] == "ok":
+                self._append_journal({"sha256": digest, "row": keys[res["index"]],
+                                      "pdf": res["pdf"]})
+            else:
+                mawb = _first_line(res["record"].get("mawb", "")) or "?"
+                errors.append(f"{mawb}: {res['error']}")
+        return _on_result
+
+    # ───── loop ─────
+    def run_once(self) -> List[dict]:
+        """One scan; returns the journal entries of the files handled."""
+        handled = []
+        for path in self._settled_files():
+            try:
+                handled.append(self.process_file(path))
+            except OSError as e:                             # locked / vanished
+                print(f"[WARN] could not process {path.name}: {e}")
+        return handled
+
+    def run_forever(self, interval: float = POLL_SECS,
+                    stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for entry in self.run_once():
+                print(f"[{entry['status'].upper()}] {entry['name']} – "
+                      f"{len(entry['pdfs'])} PDF(s), {len(entry['errors'])} error(s)")
+            stop.wait(interval)
+
+
+# ───────────────────────── CLI ─────────────────────────
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="GA Office Helper watch-folder mode")
+    ap.add_argument("inbox", help="folder the TMS drops PTT exports into")
+    ap.add_argument("--op-name", default="", help="operator name printed on PTTs")
+    ap.add_argument("--consolidate", action="store_true",
+                    help="one PTT per flight instead of one per row")
+    ap.add_argument("--compact", action="store_true",
+                    help="compress PDFs and drop duplicate resources")
+    ap.add_argument("--merge", action="store_true",
+                    help="one combined PDF per export file")
+    ap.add_argument("--settle", type=float, default=SETTLE_SECS,
+                    help="seconds a file must stay unchanged before reading")
+    ap.add_argument("--interval", type=float, default=POLL_SECS,
+                    help="seconds between scans")
+    args = ap.parse_args(argv)
+    if (args.compact or args.merge) and importlib.util.find_spec("pypdf") is None:
+        ap.error("--compact / --merge need pypdf (pip install pypdf)")
+
+    converter = make_converter()                 # one warm Word for the session
+    watcher = FolderWatcher(args.inbox, args.op_name, args.consolidate, args.settle,
+                            converter=converter, compact=args.compact,
+                            merge=args.merge)
+    print(f"Watching {watcher.inbox} (Ctrl+C to stop)")
+    try:
+        watcher.run_forever(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if converter is not None:
+            converter.close()
+    return 0
+
+
+if __name__ == "__main__":                         # pragma: no cover
+    sys.exit(main())